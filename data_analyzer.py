@@ -1,53 +1,301 @@
+import functools
+import importlib.util
+import inspect
+import os
 import pandas as pd
 import numpy as np
+from pathlib import Path
+
+# Low-cardinality identifier columns stored as categoricals for cheap grouping
+_CATEGORICAL_COLUMNS = ('machine_id', 'operator_id', 'shift')
+
+# Compact dtypes for the raw numeric columns (per-shift counts and minutes are small)
+_NUMERIC_DTYPES = {
+    'target_production': 'int32',
+    'actual_production': 'int32',
+    'downtime_minutes': 'int16',  # bounded by the 480-minute shift
+    'quality_defects': 'int32',
+    'setup_time_minutes': 'int16',
+    'material_waste_kg': 'float32'
+}
+
+# Multi-threaded Arrow CSV parser when pyarrow is installed, pandas' C parser otherwise
+_DEFAULT_CSV_ENGINE = 'pyarrow' if importlib.util.find_spec('pyarrow') else 'c'
+
+# Bumped whenever the prepared-data layout changes, so older cache files are rebuilt
+_CACHE_VERSION = 1
+
+# Failures that only cost the cache, never the load: file system errors (Arrow's I/O errors included),
+# unreadable or partially written files (ArrowInvalid is a ValueError) and a missing pyarrow
+_CACHE_ERRORS = (OSError, ValueError, ImportError)
+
+# Per-shift metrics that can be used to rank machines and operators
+_VALID_METRICS = frozenset({'oee', 'efficiency', 'quality_rate', 'availability', 'performance'})
+
+
+def _compact_dtypes(df):
+    """
+    astype() mapping to categorical ids and compact numerics for the columns df actually has,
+    applied after reading so every reader and CSV engine ends up with the same dtypes
+    A numeric column is only downcast when that loses nothing: columns with blank cells (NaN),
+    fractional or out-of-range values keep the dtype they were read with
+    """
+    dtypes = {col: 'category' for col in _CATEGORICAL_COLUMNS if col in df.columns}
+    for col, dtype in _NUMERIC_DTYPES.items():
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        if np.issubdtype(np.dtype(dtype), np.integer):
+            values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+            with np.errstate(invalid='ignore'):  # NaN has no integer value; the round trip below rejects it
+                if not (values.astype(dtype) == values).all():
+                    continue
+        dtypes[col] = dtype
+    return dtypes
+
+
+def _memoized(method):
+    """
+    Cache a KPI method's result on the analyzer, keyed by its (normalized) arguments
+    Every call returns its own copy of the cached result (see _fresh_copy)
+    """
+    signature = inspect.signature(method)
+    
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._refresh_if_replaced()
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        # Lists (e.g. a date_range built by the caller) are made hashable as tuples
+        params = tuple((name, tuple(value) if isinstance(value, list) else value)
+                       for name, value in list(bound.arguments.items())[1:])
+        key = (method.__name__, params)
+        try:
+            if key in self._kpi_cache:
+                return _fresh_copy(self._kpi_cache[key])
+        except TypeError:
+            # Unhashable arguments (such as a _precomputed dict) bypass the cache
+            return method(self, *args, **kwargs)
+        result = self._kpi_cache[key] = method(self, *args, **kwargs)
+        return _fresh_copy(result)
+    
+    return wrapper
+
+
+def _fresh_copy(result):
+    """Copy of a cached KPI result (dicts and pandas objects), so callers can edit it without affecting later calls"""
+    if isinstance(result, dict):
+        return {key: _fresh_copy(value) for key, value in result.items()}
+    if isinstance(result, (pd.DataFrame, pd.Series)):
+        return result.copy()
+    return result
+
 
 class ManufacturingKPIAnalyzer:
     """
     Manufacturing KPI Calculator
     Calculates key performance indicators for manufacturing data
     Optimized for efficiency and clarity
+    
+    KPI results are cached per argument set. Assigning a new frame to df (e.g. a row subset)
+    rebuilds the lookups and drops the cache; editing df in place (such as
+    df['actual_production'] = 0) is not detected, so assign an edited copy instead
     """
     
-    def __init__(self, data_path='data/sample_data.csv'):
-        """Initialize with manufacturing data"""
-        self.df = pd.read_csv(data_path)
-        self.df['timestamp'] = pd.to_datetime(self.df['timestamp'])
+    def __init__(self, data_path='data/sample_data.csv', date_range=None, use_cache=False, csv_engine=None):
+        """
+        Initialize with manufacturing data (CSV or Parquet)
+        Args:
+            data_path: path to a .csv or .parquet file
+            date_range: optional tuple of (start_date, end_date) to load only that window
+            use_cache: keep the prepared data in an Arrow IPC (Feather) file next to the source
+                       and reuse it while the source file's size and mtime are unchanged
+            csv_engine: pandas CSV parser, 'pyarrow' or 'c' (default: pyarrow when installed)
+        """
+        cache_path = Path(f"{data_path}.cache.feather") if use_cache else None
+        
+        # Warm start: categoricals, sort order and derived metrics are already in the cache
+        cached = self._read_cache(cache_path, data_path) if cache_path is not None else None
+        if cached is not None:
+            self.df = cached
+        else:
+            # The cache always holds the full dataset, so the date range is applied afterwards
+            self._prepare_data(self._read_data(data_path, None if use_cache else date_range,
+                                               csv_engine or _DEFAULT_CSV_ENGINE))
+            if cache_path is not None:
+                self._write_cache(cache_path, data_path)
+        
+        self._index_data(date_range if use_cache else None)
+    
+    @classmethod
+    def from_dataframe(cls, df, date_range=None):
+        """
+        Build an analyzer from an in-memory DataFrame with the raw data columns
+        Args:
+            df: DataFrame with the same columns as the CSV input (it is not modified)
+            date_range: optional tuple of (start_date, end_date) to keep only that window
+        """
+        analyzer = cls.__new__(cls)
+        # Timestamps may still be strings, e.g. for a frame read with a plain pd.read_csv
+        analyzer._prepare_data(df.assign(timestamp=pd.to_datetime(df['timestamp'])))
+        analyzer._index_data(date_range)
+        return analyzer
+    
+    def _prepare_data(self, df):
+        """Set self.df to the raw data with compact dtypes, canonical sort order and derived metrics"""
+        # Categorical ids let groupbys work on small integer codes instead of hashing strings,
+        # and compact numeric dtypes halve the bytes every KPI reduction reads
+        self.df = df.astype(_compact_dtypes(df))
+        # Timestamp stays the primary key (range filters binary-search it); machine_id
+        # as the secondary key keeps each shift's machine rows in a fixed order
+        self.df = self.df.sort_values(['timestamp', 'machine_id'], kind='stable', ignore_index=True)
         self._calculate_derived_metrics()
     
+    def _index_data(self, date_range=None):
+        """Build the timestamp lookup and empty caches for self.df, optionally narrowing it to date_range"""
+        # Sorted int64 epoch-ns copy of the timestamps for O(log N) range lookups
+        self._ts_ns = self.df['timestamp'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        self._filter_cache = {}  # (start, end) -> filtered DataFrame
+        self._kpi_cache = {}  # (method, arguments) -> result, see _memoized
+        self._indexed_df = self.df  # The frame the lookups and caches are built from
+        
+        if date_range is not None:
+            self.df = self._filter_data(date_range).reset_index(drop=True)
+            self._ts_ns = self.df['timestamp'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+            self._filter_cache = {}
+        
+        # Column-wise arrays for the KPI kernels, extracted once: every numeric column as-is
+        # and each id column as its integer category codes (ready for np.bincount)
+        self._arrays = {col: self.df[col].to_numpy() for col in self.df.columns
+                        if col != 'timestamp' and col not in _CATEGORICAL_COLUMNS}
+        self._arrays.update({col: self.df[col].cat.codes.to_numpy().astype(np.intp)
+                             for col in _CATEGORICAL_COLUMNS if col in self.df.columns})
+        self._indexed_df = self.df  # The narrowed frame, when date_range was given
+    
+    def _refresh_if_replaced(self):
+        """
+        Rebuild the lookups and drop cached results if self.df was assigned a different frame
+        (such as a row subset or edited copy of the loaded data, in any row order and with plain string ids)
+        """
+        if self.df is not self._indexed_df:
+            # Restoring the loaded layout: categorical ids and compact numerics, as in _prepare_data, and
+            # the canonical order - range filters binary-search the timestamps, and row slices are
+            # located through a default RangeIndex (see _arrays_for)
+            self.df = self.df.astype(_compact_dtypes(self.df))
+            self.df = self.df.sort_values(['timestamp', 'machine_id'], kind='stable', ignore_index=True)
+            self._index_data()
+    
+    def _arrays_for(self, df):
+        """Column arrays for df, which must be self.df or a contiguous row slice of it (see _filter_data)"""
+        if df is self.df:
+            return self._arrays
+        # self.df has a default RangeIndex, so a row slice's index gives its position directly
+        start, stop = df.index.start, df.index.stop
+        return {col: values[start:stop] for col, values in self._arrays.items()}
+    
+    @staticmethod
+    def _source_signature(data_path):
+        """Identify the current contents of a data file by cache version, size and modification time"""
+        stat = Path(data_path).stat()
+        return {'version': _CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    
+    @classmethod
+    def _read_cache(cls, cache_path, data_path):
+        """Load the prepared-data cache, or return None when it is missing, unreadable or was built from other data"""
+        try:
+            df = pd.read_feather(cache_path)
+        except _CACHE_ERRORS:
+            return None
+        # The signature travels in the file's pandas metadata; it is dropped so it doesn't ride along on results
+        if df.attrs.pop('source', None) != cls._source_signature(data_path):
+            return None
+        return df
+    
+    def _write_cache(self, cache_path, data_path):
+        """
+        Save self.df as the prepared-data cache, stamped with the source file's signature
+        Best effort: when the cache cannot be written (e.g. a read-only data directory) the run goes on without it
+        """
+        # Written under a per-process temporary name and renamed into place, so a concurrent run
+        # never reads a partially written cache
+        tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+        self.df.attrs['source'] = self._source_signature(data_path)
+        try:
+            self.df.to_feather(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except _CACHE_ERRORS:
+            tmp_path.unlink(missing_ok=True)
+        finally:
+            del self.df.attrs['source']
+    
+    @staticmethod
+    def _read_data(data_path, date_range=None, csv_engine=_DEFAULT_CSV_ENGINE):
+        """Read the raw CSV/Parquet data, keeping only rows inside date_range when given"""
+        if date_range is not None:
+            start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
+        
+        if str(data_path).endswith('.parquet'):
+            # Parquet keeps dtypes, so timestamps arrive already parsed;
+            # the date filter is pushed into the reader so out-of-range row groups are skipped
+            filters = None
+            if date_range is not None:
+                filters = [('timestamp', '>=', start_date), ('timestamp', '<=', end_date)]
+            return pd.read_parquet(data_path, filters=filters)
+        
+        # Parsing timestamps and categorical ids inside the CSV reader avoids second passes and never
+        # materializes the id columns as per-row Python strings; numeric columns keep the parser's
+        # own dtypes and are compacted after loading (see _compact_dtypes)
+        df = pd.read_csv(data_path, engine=csv_engine, parse_dates=['timestamp'],
+                         dtype={col: 'category' for col in _CATEGORICAL_COLUMNS})
+        if date_range is not None:
+            # Dropping out-of-range rows before any derived metrics are computed
+            df = df[(df['timestamp'] >= start_date) & (df['timestamp'] <= end_date)]
+        return df
+    
     def _calculate_derived_metrics(self):
         """Calculate derived metrics that will be used in multiple KPIs"""
         # Core calculations - calculate once, use multiple times
         shift_minutes = 480  # 8 hours = 480 minutes
         
+        # Pulling the raw columns out once so every metric below works on plain arrays
+        actual = self.df['actual_production'].to_numpy()
+        target = self.df['target_production'].to_numpy()
+        downtime = self.df['downtime_minutes'].to_numpy()
+        defects = self.df['quality_defects'].to_numpy()
+        
         # Efficiency per record
-        self.df['efficiency'] = (self.df['actual_production'] / 
-                               self.df['target_production'] * 100).round(2)
+        efficiency = actual / target * 100
         
         # Time-based metrics
-        self.df['available_minutes'] = shift_minutes - self.df['downtime_minutes']
-        self.df['availability'] = (self.df['available_minutes'] / shift_minutes * 100).round(2)
+        available_minutes = shift_minutes - downtime
+        available_ratio = available_minutes / shift_minutes
+        availability = available_ratio * 100
         
         # Performance ratio (actual vs adjusted target when available)
-        self.df['performance'] = np.where(
-            self.df['available_minutes'] > 0,
-            (self.df['actual_production'] / 
-             (self.df['target_production'] * np.maximum(self.df['available_minutes'] / shift_minutes, 0.001)) * 100),
+        performance = np.where(
+            available_minutes > 0,
+            actual / (target * np.maximum(available_ratio, 0.001)) * 100,
             0
-        ).round(2)
+        )
         
         # Quality rate (good units / total units)
-        self.df['quality_rate'] = np.where(
-            self.df['actual_production'] > 0,
-            ((self.df['actual_production'] - self.df['quality_defects']) / 
-             self.df['actual_production'] * 100),
-            0
-        ).round(2)
+        quality_rate = np.where(actual > 0, (actual - defects) / actual * 100, 0)
         
-        # OEE calculation
-        self.df['oee'] = (self.df['availability'] * self.df['performance'] * 
-                         self.df['quality_rate'] / 10000).round(2)
+        # OEE calculation - built from unrounded components to avoid compounding rounding error
+        oee = availability * performance * quality_rate / 10000
+        
+        # Attaching all derived columns in a single assignment, stored as float32
+        # (not rounded - rounding happens when results are reported)
+        self.df = self.df.assign(
+            efficiency=efficiency.astype(np.float32),
+            available_minutes=available_minutes,
+            availability=availability.astype(np.float32),
+            performance=performance.astype(np.float32),
+            quality_rate=quality_rate.astype(np.float32),
+            oee=oee.astype(np.float32)
+        )
     
-    def calculate_overall_efficiency(self, group_by=None, date_range=None):
+    @_memoized
+    def calculate_overall_efficiency(self, group_by=None, date_range=None, _precomputed=None):
         """
         Calculate overall equipment efficiency
         Args:
@@ -57,29 +305,29 @@ class ManufacturingKPIAnalyzer:
         df_filtered = self._filter_data(date_range)
         
         if group_by:
-            result = df_filtered.groupby(group_by).agg({
-                'actual_production': 'sum',
-                'target_production': 'sum',
-                'efficiency': 'mean'
-            }).round(2)
+            result = self._group_aggregate(
+                df_filtered, group_by,
+                actual_production=('actual_production', 'sum'),
+                target_production=('target_production', 'sum'),
+                efficiency=('efficiency', 'mean')
+            ).round(2)
             # Calculating true efficiency from totals (more accurate than average)
             result['calculated_efficiency'] = (result['actual_production'] / 
                                              result['target_production'] * 100).round(2)
             return result
         else:
-            # Overall calculations - minimize operations
-            total_actual = df_filtered['actual_production'].sum()
-            total_target = df_filtered['target_production'].sum()
+            totals = _precomputed or self._aggregate_overall(df_filtered)
             
             return {
-                'total_actual_production': total_actual,
-                'total_target_production': total_target,
-                'overall_efficiency': round(total_actual / total_target * 100, 2),
-                'average_efficiency_per_shift': round(df_filtered['efficiency'].mean(), 2),
-                'total_shifts_analyzed': len(df_filtered)
+                'total_actual_production': totals['total_actual'],
+                'total_target_production': totals['total_target'],
+                'overall_efficiency': round(totals['total_actual'] / totals['total_target'] * 100, 2),
+                'average_efficiency_per_shift': round(totals['mean_efficiency'], 2),
+                'total_shifts_analyzed': totals['shifts']
             }
     
-    def calculate_oee(self, group_by=None, date_range=None):
+    @_memoized
+    def calculate_oee(self, group_by=None, date_range=None, _precomputed=None):
         """
         Calculate Overall Equipment Effectiveness (OEE)
         OEE = Availability × Performance × Quality
@@ -87,27 +335,28 @@ class ManufacturingKPIAnalyzer:
         df_filtered = self._filter_data(date_range)
         
         if group_by:
-            result = df_filtered.groupby(group_by).agg({
-                'availability': 'mean',
-                'performance': 'mean', 
-                'quality_rate': 'mean',
-                'oee': 'mean',
-                'actual_production': 'sum',
-                'downtime_minutes': 'sum'
-            }).round(2)
+            result = self._group_aggregate(
+                df_filtered, group_by,
+                availability=('availability', 'mean'),
+                performance=('performance', 'mean'),
+                quality_rate=('quality_rate', 'mean'),
+                oee=('oee', 'mean'),
+                actual_production=('actual_production', 'sum'),
+                downtime_minutes=('downtime_minutes', 'sum')
+            ).round(2)
             # Add total downtime in hours for business context
             result['total_downtime_hours'] = (result['downtime_minutes'] / 60).round(1)
             return result
         else:
-            # Optimizing overall OEE calculation
-            total_shifts = len(df_filtered)
+            totals = _precomputed or self._aggregate_overall(df_filtered)
+            total_shifts = totals['shifts']
             total_possible_time = total_shifts * 480  # 480 minutes per shift
-            total_available_time = total_possible_time - df_filtered['downtime_minutes'].sum()
+            total_available_time = total_possible_time - totals['total_downtime']
             
             # Calculating OEE components
             overall_availability = total_available_time / total_possible_time * 100
-            overall_performance = df_filtered['performance'].mean()
-            overall_quality = df_filtered['quality_rate'].mean()
+            overall_performance = totals['mean_performance']
+            overall_quality = totals['mean_quality']
             overall_oee = overall_availability * overall_performance * overall_quality / 10000
             
             return {
@@ -115,108 +364,132 @@ class ManufacturingKPIAnalyzer:
                 'performance': round(overall_performance, 2),
                 'quality_rate': round(overall_quality, 2),
                 'oee': round(overall_oee, 2),
-                'total_production': df_filtered['actual_production'].sum(),
+                'total_production': totals['total_actual'],
                 'total_downtime_hours': round((total_possible_time - total_available_time) / 60, 1),
                 'total_shifts_analyzed': total_shifts,
-                'utilization_days': (df_filtered['timestamp'].max() - df_filtered['timestamp'].min()).days + 1
+                'utilization_days': (totals['last_timestamp'] - totals['first_timestamp']).days + 1
             }
     
-    def calculate_throughput_metrics(self, group_by=None, date_range=None):
+    @_memoized
+    def calculate_throughput_metrics(self, group_by=None, date_range=None, _precomputed=None):
         """Calculate throughput and cycle time metrics"""
         df_filtered = self._filter_data(date_range)
         
         if group_by:
-            result = df_filtered.groupby(group_by).agg({
-                'actual_production': ['sum', 'mean'],
-                'available_minutes': 'sum'
-            })
-            # Flattening column names for easier access
-            result.columns = ['total_production', 'avg_production_per_shift', 'total_available_minutes']
+            result = self._group_aggregate(
+                df_filtered, group_by,
+                total_production=('actual_production', 'sum'),
+                avg_production_per_shift=('actual_production', 'mean'),
+                total_available_minutes=('available_minutes', 'sum')
+            )
             result['throughput_per_hour'] = (result['total_production'] / 
                                            (result['total_available_minutes'] / 60)).round(2)
             return result
         else:
-            # Optimizing calculations
-            total_production = df_filtered['actual_production'].sum()
-            total_available_minutes = df_filtered['available_minutes'].sum()
-            total_available_hours = total_available_minutes / 60
+            totals = _precomputed or self._aggregate_overall(df_filtered)
+            total_production = totals['total_actual']
+            total_available_hours = totals['total_available_minutes'] / 60
             
             return {
                 'total_production': total_production,
                 'total_available_hours': round(total_available_hours, 1),
                 'average_throughput_per_hour': round(total_production / total_available_hours, 2),
-                'average_production_per_shift': round(df_filtered['actual_production'].mean(), 2),
-                'peak_shift_production': df_filtered['actual_production'].max(),
-                'total_shifts_analyzed': len(df_filtered)
+                'average_production_per_shift': round(totals['mean_actual'], 2),
+                'peak_shift_production': totals['max_actual'],
+                'total_shifts_analyzed': totals['shifts']
             }
     
-    def calculate_downtime_analysis(self, group_by=None, date_range=None):
+    @_memoized
+    def calculate_downtime_analysis(self, group_by=None, date_range=None, _precomputed=None):
         """Analyze downtime patterns"""
         df_filtered = self._filter_data(date_range)
         
         if group_by:
-            result = df_filtered.groupby(group_by).agg({
-                'downtime_minutes': ['sum', 'mean', 'max'],
-                'availability': 'mean'
-            }).round(2)
-            result.columns = ['total_downtime_min', 'avg_downtime_min', 'max_downtime_min', 'avg_availability']
+            result = self._group_aggregate(
+                df_filtered, group_by,
+                total_downtime_min=('downtime_minutes', 'sum'),
+                avg_downtime_min=('downtime_minutes', 'mean'),
+                max_downtime_min=('downtime_minutes', 'max'),
+                avg_availability=('availability', 'mean')
+            ).round(2)
             # Converting to hours for business readability
             result['total_downtime_hours'] = (result['total_downtime_min'] / 60).round(1)
             return result
         else:
-            # Single pass through data for all calculations
-            downtime_data = df_filtered['downtime_minutes']
-            total_downtime = downtime_data.sum()
+            totals = _precomputed or self._aggregate_overall(df_filtered)
             
             return {
-                'total_downtime_hours': round(total_downtime / 60, 1),
-                'average_downtime_per_shift_minutes': round(downtime_data.mean(), 1),
-                'worst_downtime_shift_minutes': downtime_data.max(),
-                'shifts_with_high_downtime': (downtime_data > 60).sum(),  # >1 hour - optimized boolean sum
-                'shifts_with_zero_downtime': (downtime_data == 0).sum(),
-                'overall_availability': round(df_filtered['availability'].mean(), 2),
-                'total_shifts_analyzed': len(df_filtered)
+                'total_downtime_hours': round(totals['total_downtime'] / 60, 1),
+                'average_downtime_per_shift_minutes': round(totals['mean_downtime'], 1),
+                'worst_downtime_shift_minutes': totals['max_downtime'],
+                'shifts_with_high_downtime': totals['high_downtime_shifts'],
+                'shifts_with_zero_downtime': totals['zero_downtime_shifts'],
+                'overall_availability': round(totals['mean_availability'], 2),
+                'total_shifts_analyzed': totals['shifts']
             }
     
-    def calculate_quality_metrics(self, group_by=None, date_range=None):
+    @_memoized
+    def calculate_quality_metrics(self, group_by=None, date_range=None, _precomputed=None):
         """Calculate quality-related KPIs"""
         df_filtered = self._filter_data(date_range)
         
         if group_by:
-            result = df_filtered.groupby(group_by).agg({
-                'quality_defects': 'sum',
-                'actual_production': 'sum',
-                'quality_rate': 'mean'
-            }).round(2)
+            result = self._group_aggregate(
+                df_filtered, group_by,
+                quality_defects=('quality_defects', 'sum'),
+                actual_production=('actual_production', 'sum'),
+                quality_rate=('quality_rate', 'mean')
+            ).round(2)
             result['defect_rate'] = ((result['quality_defects'] / result['actual_production']) * 100).round(3)
             return result
         else:
-            # Optimizing by calculating totals once
-            total_defects = df_filtered['quality_defects'].sum()
-            total_production = df_filtered['actual_production'].sum()
-            quality_rates = df_filtered['quality_rate']
+            totals = _precomputed or self._aggregate_overall(df_filtered)
+            total_defects = totals['total_defects']
+            total_production = totals['total_actual']
             
             return {
                 'total_defects': total_defects,
                 'total_production': total_production,
                 'overall_defect_rate': round((total_defects / total_production) * 100, 3),
-                'average_quality_rate': round(quality_rates.mean(), 2),
-                'best_quality_shift': round(quality_rates.max(), 2),
-                'worst_quality_shift': round(quality_rates.min(), 2),
-                'quality_consistency_std': round(quality_rates.std(), 2),
-                'total_shifts_analyzed': len(df_filtered)
+                'average_quality_rate': round(totals['mean_quality'], 2),
+                'best_quality_shift': round(totals['max_quality'], 2),
+                'worst_quality_shift': round(totals['min_quality'], 2),
+                'quality_consistency_std': round(totals['std_quality'], 2),
+                'total_shifts_analyzed': totals['shifts']
             }
     
+    def calculate_all(self, group_by=None, date_range=None):
+        """
+        Calculate the OEE, efficiency, throughput, downtime and quality KPIs together
+        Args:
+            group_by: 'machine_id', 'shift', 'operator_id', or None for overall
+            date_range: tuple of (start_date, end_date) as strings
+        Returns a dict keyed by KPI family, each value shaped like the matching calculate_* result
+        """
+        # Overall KPIs all derive from one sweep of the data; grouped KPIs share
+        # the filtered slice and the load-time category codes
+        totals = None if group_by else self._aggregate_overall(self._filter_data(date_range))
+        
+        return {
+            'oee': self.calculate_oee(group_by, date_range, _precomputed=totals),
+            'efficiency': self.calculate_overall_efficiency(group_by, date_range, _precomputed=totals),
+            'throughput': self.calculate_throughput_metrics(group_by, date_range, _precomputed=totals),
+            'downtime': self.calculate_downtime_analysis(group_by, date_range, _precomputed=totals),
+            'quality': self.calculate_quality_metrics(group_by, date_range, _precomputed=totals)
+        }
+    
+    @_memoized
     def get_top_performers(self, metric='oee', top_n=3):
         """Get top performing machines/operators by specified metric"""
         # Validate metric parameter
-        valid_metrics = ['oee', 'efficiency', 'quality_rate', 'availability', 'performance']
-        if metric not in valid_metrics:
-            raise ValueError(f"Metric must be one of: {valid_metrics}")
+        if metric not in _VALID_METRICS:
+            raise ValueError(f"Metric must be one of: {sorted(_VALID_METRICS)}")
         
-        # Single groupby operation for both machine and operator rankings
-        by_machine = self.df.groupby('machine_id')[metric].mean().sort_values(ascending=False)
-        by_operator = self.df.groupby('operator_id')[metric].mean().sort_values(ascending=False)
+        # Code-indexed means for both machine and operator rankings
+        by_machine = self._group_aggregate(self.df, 'machine_id', **{metric: (metric, 'mean')})[metric]
+        by_operator = self._group_aggregate(self.df, 'operator_id', **{metric: (metric, 'mean')})[metric]
+        by_machine = by_machine.sort_values(ascending=False)
+        by_operator = by_operator.sort_values(ascending=False)
         
         return {
             'top_machines': by_machine.head(top_n).round(2),
@@ -226,56 +499,184 @@ class ManufacturingKPIAnalyzer:
             'total_operators': len(by_operator)
         }
     
+    def _aggregate_overall(self, df):
+        """
+        Compute every scalar the overall KPIs need in one sweep of the frame
+        Returns a flat dict of totals, means and extremes
+        """
+        if len(df) == 0:
+            # An empty date range: zero sums and counts, NaN means and extremes, NaT dates (as pandas gives)
+            zero, nan = np.int64(0), np.float64(np.nan)
+            return {
+                'shifts': 0,
+                'total_actual': zero, 'total_target': zero, 'total_defects': zero,
+                'total_downtime': zero, 'total_available_minutes': zero,
+                'mean_actual': nan, 'max_actual': nan, 'mean_downtime': nan, 'max_downtime': nan,
+                'high_downtime_shifts': zero, 'zero_downtime_shifts': zero,
+                'mean_efficiency': nan, 'mean_availability': nan, 'mean_performance': nan,
+                'mean_quality': nan, 'max_quality': nan, 'min_quality': nan, 'std_quality': nan,
+                'first_timestamp': pd.NaT, 'last_timestamp': pd.NaT
+            }
+        
+        # Plain column arrays from the load-time cache; float32 metrics are reduced in float64.
+        # NaN-skipping reductions, as with pandas: a column with blank cells stays float (see _compact_dtypes)
+        arrays = self._arrays_for(df)
+        actual = arrays['actual_production']
+        downtime = arrays['downtime_minutes']
+        quality = arrays['quality_rate']
+        timestamps = df['timestamp']
+        
+        # Bucketing downtime in one pass: 0 -> none, 1 -> up to an hour, 2 -> over an hour
+        # (downtime is non-negative minutes, so the first bucket is exactly the zero-downtime shifts;
+        # blank downtime cells are left out of every bucket)
+        downtime_buckets = np.bincount(np.searchsorted([0, 60], downtime[downtime == downtime]), minlength=3)
+        
+        return {
+            'shifts': len(df),
+            'total_actual': np.nansum(actual),
+            'total_target': np.nansum(arrays['target_production']),
+            'total_defects': np.nansum(arrays['quality_defects']),
+            'total_downtime': np.nansum(downtime),
+            'total_available_minutes': np.nansum(arrays['available_minutes']),
+            'mean_actual': np.nanmean(actual),
+            'max_actual': np.nanmax(actual),
+            'mean_downtime': np.nanmean(downtime),
+            'max_downtime': np.nanmax(downtime),
+            'high_downtime_shifts': downtime_buckets[2],
+            'zero_downtime_shifts': downtime_buckets[0],
+            'mean_efficiency': np.nanmean(arrays['efficiency'], dtype=np.float64),
+            'mean_availability': np.nanmean(arrays['availability'], dtype=np.float64),
+            'mean_performance': np.nanmean(arrays['performance'], dtype=np.float64),
+            'mean_quality': np.nanmean(quality, dtype=np.float64),
+            'max_quality': np.float64(np.nanmax(quality)),
+            'min_quality': np.float64(np.nanmin(quality)),
+            'std_quality': np.nanstd(quality, ddof=1, dtype=np.float64),  # sample std, matching pandas
+            'first_timestamp': timestamps.min(),
+            'last_timestamp': timestamps.max()
+        }
+    
+    def _group_aggregate(self, df, group_by, **aggregations):
+        """
+        Grouped sum/mean/max over a categorical column using its integer codes
+        Args:
+            df: frame to aggregate (self.df or a filtered view of it)
+            group_by: one of the categorical id columns
+            aggregations: output_name=(column, 'sum'|'mean'|'max'|'size'), like pandas named aggregation
+        Returns a DataFrame indexed by the observed group labels
+        """
+        if group_by not in _CATEGORICAL_COLUMNS:
+            return df.groupby(group_by).agg(**aggregations)
+        
+        # Accumulating into fixed-size arrays indexed by category code
+        arrays = self._arrays_for(df)
+        codes = arrays[group_by]
+        # Rows with a blank group key (category code -1) belong to no group, as pandas' groupby drops NaN keys
+        keyed = codes >= 0
+        if keyed.all():
+            keyed = None
+        else:
+            codes = codes[keyed]
+        categories = self.df[group_by].cat.categories
+        n_groups = len(categories)
+        counts = np.bincount(codes, minlength=n_groups)
+        observed = counts > 0
+        
+        result = {}
+        for name, (column, how) in aggregations.items():
+            if how == 'size':
+                result[name] = counts[observed]
+                continue
+            values, value_codes = (arrays[column] if keyed is None else arrays[column][keyed]), codes
+            if values.dtype.kind == 'f':
+                # Blank cells (NaN) are skipped, as pandas' groupby does
+                present = ~np.isnan(values)
+                if not present.all():
+                    values, value_codes = values[present], codes[present]
+            if how == 'max':
+                out = np.full(n_groups, -np.inf)
+                np.maximum.at(out, value_codes, values)
+                out[np.isneginf(out)] = np.nan  # Only reached by groups whose values are all blank
+            else:
+                out = np.bincount(value_codes, weights=values, minlength=n_groups)
+                if how == 'mean':
+                    with np.errstate(invalid='ignore', divide='ignore'):  # All-blank groups average to NaN
+                        out = out / np.bincount(value_codes, minlength=n_groups)
+            out = out[observed]
+            # Integer sums and maxima stay integers, as with pandas
+            if how != 'mean' and np.issubdtype(values.dtype, np.integer):
+                out = out.astype(np.int64)
+            result[name] = out
+        
+        index = pd.Index(categories[observed], name=group_by)
+        return pd.DataFrame(result, index=index)
+    
     def _filter_data(self, date_range):
         """Helper method to filter data by date range"""
+        self._refresh_if_replaced()
         if date_range is None:
             return self.df
         
-        start_date, end_date = pd.to_datetime(date_range[0]), pd.to_datetime(date_range[1])
-        return self.df[(self.df['timestamp'] >= start_date) & (self.df['timestamp'] <= end_date)]
+        # Reusing the filtered frame when several KPIs ask for the same range
+        cache_key = (str(date_range[0]), str(date_range[1]))
+        if cache_key not in self._filter_cache:
+            start_ns = pd.to_datetime(date_range[0]).value
+            end_ns = pd.to_datetime(date_range[1]).value
+            # Data is sorted by timestamp, so the range is a contiguous slice (both ends inclusive)
+            start_pos = np.searchsorted(self._ts_ns, start_ns, side='left')
+            end_pos = np.searchsorted(self._ts_ns, end_ns, side='right')
+            self._filter_cache[cache_key] = self.df.iloc[start_pos:end_pos]
+        return self._filter_cache[cache_key]
     
     def get_summary_report(self, date_range=None):
         """Generate a comprehensive summary report"""
         df_filtered = self._filter_data(date_range)
         
+        # One aggregation sweep shared by every overall KPI below
+        totals = self._aggregate_overall(df_filtered)
+        
         # Calculating date range info once
-        date_min, date_max = df_filtered['timestamp'].min(), df_filtered['timestamp'].max()
+        date_min, date_max = totals['first_timestamp'], totals['last_timestamp']
+        # Categorical value_counts also lists shifts that fall outside the filter
+        shift_counts = df_filtered['shift'].value_counts()
         
         report = {
             'data_overview': {
                 'total_records': len(df_filtered),
                 'date_range': (date_min.strftime('%Y-%m-%d'), date_max.strftime('%Y-%m-%d')),
                 'analysis_days': (date_max - date_min).days + 1,
-                'machines': sorted(df_filtered['machine_id'].unique().tolist()),
-                'operators': sorted(df_filtered['operator_id'].unique().tolist()),
-                'shifts_analyzed': df_filtered['shift'].value_counts().to_dict()
+                'machines': sorted(df_filtered['machine_id'].dropna().unique().tolist()),
+                'operators': sorted(df_filtered['operator_id'].dropna().unique().tolist()),
+                'shifts_analyzed': shift_counts[shift_counts > 0].to_dict()
             },
-            'overall_kpis': self.calculate_oee(date_range=date_range),
-            'efficiency': self.calculate_overall_efficiency(date_range=date_range),
-            'throughput': self.calculate_throughput_metrics(date_range=date_range),
-            'downtime': self.calculate_downtime_analysis(date_range=date_range),
-            'quality': self.calculate_quality_metrics(date_range=date_range),
+            'overall_kpis': self.calculate_oee(date_range=date_range, _precomputed=totals),
+            'efficiency': self.calculate_overall_efficiency(date_range=date_range, _precomputed=totals),
+            'throughput': self.calculate_throughput_metrics(date_range=date_range, _precomputed=totals),
+            'downtime': self.calculate_downtime_analysis(date_range=date_range, _precomputed=totals),
+            'quality': self.calculate_quality_metrics(date_range=date_range, _precomputed=totals),
             'top_performers': self.get_top_performers()
         }
         return report
     
+    @_memoized
     def get_machine_comparison(self, metric='oee', date_range=None):
         """Compare all machines on a specific metric"""
         df_filtered = self._filter_data(date_range)
         
-        comparison = df_filtered.groupby('machine_id').agg({
-            'oee': 'mean',
-            'efficiency': 'mean',
-            'availability': 'mean',
-            'performance': 'mean',
-            'quality_rate': 'mean',
-            'actual_production': 'sum',
-            'downtime_minutes': 'sum'
-        }).round(2)
+        comparison = self._group_aggregate(
+            df_filtered, 'machine_id',
+            oee=('oee', 'mean'),
+            efficiency=('efficiency', 'mean'),
+            availability=('availability', 'mean'),
+            performance=('performance', 'mean'),
+            quality_rate=('quality_rate', 'mean'),
+            actual_production=('actual_production', 'sum'),
+            downtime_minutes=('downtime_minutes', 'sum'),
+            shifts_operated=('machine_id', 'size')
+        ).round(2)
         
-        # Adding derived metrics
-        comparison['total_downtime_hours'] = (comparison['downtime_minutes'] / 60).round(1)
-        comparison['shifts_operated'] = df_filtered.groupby('machine_id').size()
+        # Adding derived metrics (placed ahead of the shift count)
+        comparison.insert(comparison.columns.get_loc('shifts_operated'), 'total_downtime_hours',
+                          (comparison['downtime_minutes'] / 60).round(1))
         
         # Sorting by specified metric
         comparison = comparison.sort_values(metric, ascending=False)
@@ -287,11 +688,13 @@ class ManufacturingKPIAnalyzer:
         df_filtered = self._filter_data(date_range)
         
         if group_by == 'timestamp':
-            # Grouping by date for daily trends
-            df_filtered['date'] = df_filtered['timestamp'].dt.date
-            trend_data = df_filtered.groupby('date')[metric].mean().round(2)
+            # Grouping by midnight-normalized timestamps keeps the key in datetime64 space
+            days = df_filtered['timestamp'].dt.normalize().rename('date')
+            trend_data = df_filtered.groupby(days)[metric].mean().astype(np.float64).round(2)
+            # Only the per-day result is converted to date labels
+            trend_data.index = pd.Index(trend_data.index.date, name='date')
         else:
-            trend_data = df_filtered.groupby(group_by)[metric].mean().round(2)
+            trend_data = df_filtered.groupby(group_by, observed=True)[metric].mean().astype(np.float64).round(2)
         
         return {
             'trend_data': trend_data,
@@ -1,14 +1,12 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import random
 
 def generate_manufacturing_data(days=30, machines=6):
     """Generate realistic manufacturing data"""
     
-    # Set random seed for reproducible data
-    np.random.seed(1)
-    random.seed(1)
+    # Single seeded generator for reproducible data
+    rng = np.random.default_rng(1)
     
     # Machine configurations
     machines_config = {
@@ -25,70 +23,57 @@ def generate_manufacturing_data(days=30, machines=6):
     shifts = ['Morning', 'Afternoon', 'Night']
     #shift_hours = {'Morning': (6, 14), 'Afternoon': (14, 22), 'Night': (22, 6)}
     
-    data = []
+    # Per-machine and per-shift lookup arrays, indexed by position
+    machine_ids = np.array(list(machines_config))
+    target_rates = np.array([config['target_rate'] for config in machines_config.values()])
+    reliabilities = np.array([config['reliability'] for config in machines_config.values()])
+    shift_factors = np.array([1.0, 0.95, 0.85])  # Morning best, Afternoon slight dip, Night lower
+    shift_start_hours = np.array([6, 14, 22])
+    
+    # Calendar days, skipping weekends (drop this filter for 24/7 operation)
     start_date = datetime.now() - timedelta(days=days)
+    calendar = pd.date_range(start_date.replace(hour=0, minute=0, second=0), periods=days, freq='D')
+    work_days = calendar[calendar.weekday < 5]  # Saturday = 5, Sunday = 6
     
-    for day in range(days):
-        current_date = start_date + timedelta(days=day)
-        
-        # Skip weekends (optional - comment out if 24/7 operation)
-        if current_date.weekday() >= 5:  # Saturday = 5, Sunday = 6
-            continue
-            
-        for shift in shifts:
-            for machine_id, config in machines_config.items():
-                
-                # Shift-based variations
-                if shift == 'Night':
-                    performance_factor = 0.85  # Night shift typically lower
-                elif shift == 'Morning':
-                    performance_factor = 1.0   # Best performance
-                else:
-                    performance_factor = 0.95  # Afternoon slight dip
-                
-                # Random operator assignment
-                operator = random.choice(operators)
-                
-                # Calculate production metrics
-                target_production = config['target_rate'] * 8  # 8-hour shift
-                
-                # Add realistic variability
-                efficiency = (config['reliability'] * performance_factor * 
-                            np.random.normal(1.0, 0.1))  # ±10% variation
-                efficiency = max(0.3, min(1.2, efficiency))  # Keep reasonable bounds
-                
-                actual_production = int(target_production * efficiency)
-                
-                # Calculate downtime (inversely related to efficiency)
-                base_downtime = (1 - config['reliability']) * 480  # 480 minutes in 8 hours
-                downtime_minutes = max(0, int(base_downtime + np.random.normal(0, 20)))
-                
-                # Quality defects (typically 1-5% of production)
-                defect_rate = np.random.uniform(0.01, 0.05)
-                quality_defects = int(actual_production * defect_rate)
-                
-                # Create timestamp for the shift
-                if shift == 'Morning':
-                    timestamp = current_date.replace(hour=6, minute=0, second=0)
-                elif shift == 'Afternoon':
-                    timestamp = current_date.replace(hour=14, minute=0, second=0)
-                else:  # Night
-                    timestamp = current_date.replace(hour=22, minute=0, second=0)
-                
-                data.append({
-                    'timestamp': timestamp,
-                    'machine_id': machine_id,
-                    'operator_id': operator,
-                    'shift': shift,
-                    'target_production': target_production,
-                    'actual_production': actual_production,
-                    'downtime_minutes': downtime_minutes,
-                    'quality_defects': quality_defects,
-                    'setup_time_minutes': np.random.randint(15, 45),  # Setup time
-                    'material_waste_kg': np.random.uniform(2.0, 8.0),  # Material waste
-                })
-    
-    return pd.DataFrame(data)
+    # One row per (day, shift, machine), in that nesting order
+    n_days, n_shifts, n_machines = len(work_days), len(shifts), len(machine_ids)
+    n_records = n_days * n_shifts * n_machines
+    day_idx = np.repeat(np.arange(n_days), n_shifts * n_machines)
+    shift_idx = np.tile(np.repeat(np.arange(n_shifts), n_machines), n_days)
+    machine_idx = np.tile(np.arange(n_machines), n_days * n_shifts)
+    
+    reliability = reliabilities[machine_idx]
+    
+    # Calculate production metrics
+    target_production = target_rates[machine_idx] * 8  # 8-hour shift
+    
+    # Add realistic variability (±10%) and keep reasonable bounds
+    efficiency = np.clip(reliability * shift_factors[shift_idx] * rng.normal(1.0, 0.1, n_records), 0.3, 1.2)
+    actual_production = (target_production * efficiency).astype(int)
+    
+    # Calculate downtime (inversely related to efficiency)
+    base_downtime = (1 - reliability) * 480  # 480 minutes in 8 hours
+    downtime_minutes = np.maximum(0, (base_downtime + rng.normal(0, 20, n_records)).astype(int))
+    
+    # Quality defects (typically 1-5% of production)
+    defect_rate = rng.uniform(0.01, 0.05, n_records)
+    quality_defects = (actual_production * defect_rate).astype(int)
+    
+    # Timestamp for the start of each shift
+    timestamps = work_days[day_idx] + pd.to_timedelta(shift_start_hours[shift_idx], unit='h')
+    
+    return pd.DataFrame({
+        'timestamp': timestamps,
+        'machine_id': machine_ids[machine_idx],
+        'operator_id': rng.choice(operators, size=n_records),  # Random operator assignment
+        'shift': np.array(shifts)[shift_idx],
+        'target_production': target_production,
+        'actual_production': actual_production,
+        'downtime_minutes': downtime_minutes,
+        'quality_defects': quality_defects,
+        'setup_time_minutes': rng.integers(15, 45, n_records),  # Setup time
+        'material_waste_kg': rng.uniform(2.0, 8.0, n_records),  # Material waste
+    })
 
 if __name__ == "__main__":
     # Generate the data
@@ -128,7 +113,8 @@ if __name__ == "__main__":
     print("\nFIRST 5 RECORDS:")
     print(df.head())
     
-    # Save to CSV
+    # Save to CSV (human readable) and Parquet (typed, compact, faster to load)
     df.to_csv('data/sample_data.csv', index=False)
+    df.to_parquet('data/sample_data.parquet', compression='zstd', index=False)
 
-    print(f"\n💾 Saved to: data/sample_data.csv")
\ No newline at end of file
+    print(f"\n💾 Saved to: data/sample_data.csv and data/sample_data.parquet")
\ No newline at end of file
@@ -2,7 +2,23 @@ import argparse
 import data_analyzer as da
 import sys
 from pathlib import Path
-from visualizer import ManufacturingVisualizer
+
+# Analysis modes dispatched straight to the analyzer: mode -> callable(analyzer, group_by=..., date_range=...)
+ANALYSIS_DISPATCH = {
+    "oee": da.ManufacturingKPIAnalyzer.calculate_oee,
+    "efficiency": da.ManufacturingKPIAnalyzer.calculate_overall_efficiency,
+    "throughput": da.ManufacturingKPIAnalyzer.calculate_throughput_metrics,
+    "downtime": da.ManufacturingKPIAnalyzer.calculate_downtime_analysis,
+    "quality": da.ManufacturingKPIAnalyzer.calculate_quality_metrics,
+    "top": lambda analyzer, **_: analyzer.get_top_performers(metric="oee"),
+    "all": da.ManufacturingKPIAnalyzer.calculate_all,
+}
+
+# Command line choices, built once at import
+ANALYSIS_MODES = ("summary", *ANALYSIS_DISPATCH, "viz")
+GROUP_BY_FIELDS = ("machine_id", "shift", "operator_id")
+CHART_TYPES = ("overview", "trends", "machines", "report")
+CSV_ENGINES = ("pyarrow", "c")
 
 
 def print_kpi_summary(analyzer):
@@ -41,6 +57,20 @@ def print_kpi_summary(analyzer):
     print(f"   Best Operator:    {top_performers['top_operators'].index[0]} ({top_performers['top_operators'].iloc[0]:.1f}% OEE)")
 
 
+def round_display(value, digits=3):
+    """
+    Rounds floats (including inside dicts and pandas objects) for printing
+    Three digits by default: defect rates are reported to three decimals, other KPIs to two or fewer
+    """
+    if isinstance(value, dict):
+        return {key: round_display(item, digits) for key, item in value.items()}
+    if isinstance(value, float):
+        return round(value, digits)
+    if getattr(value, 'ndim', 0):  # pandas Series / DataFrame
+        return value.round(digits)
+    return value
+
+
 def get_performance_rating(oee_value):
     """Performance rating for OEE"""
     if oee_value >= 85:
@@ -64,6 +94,7 @@ def print_usage_info():
         quality           -> Quality rate and defects analysis
         downtime          -> Downtime patterns analysis
         top               -> Top performing machines/operators
+        all               -> OEE, efficiency, throughput, downtime and quality together
         viz               -> Create specific visualizations
 
         CHART TYPES (--chart, used with --mode viz):
@@ -71,6 +102,8 @@ def print_usage_info():
         trends            -> Time-series trend analysis  
         machines          -> Machine performance comparison
         report            -> Generate all visualizations
+        --dpi             -> Saved chart resolution (default 150, or KPI_DPI)
+        --pdf             -> Save the report as one multi-page PDF
 
         GROUPING (--group-by):
         machine_id        -> Results grouped by machine
@@ -80,6 +113,8 @@ def print_usage_info():
         DATE FILTERING:
         --start --end     -> Filter data to specific date range
         --no-demo         -> Skip visual demo in summary mode
+        --no-cache        -> Ignore the prepared-data cache and re-read the data file
+        --engine          -> CSV parser: pyarrow (default when installed) or c
 
         COMMON USAGE EXAMPLES:
         python main.py                                    # Full demo (best first experience)
@@ -89,30 +124,33 @@ def print_usage_info():
     """)
     print("="*100)
 
-def run_visual_demo(analyzer):
+def run_visual_demo(analyzer, dpi=None):
     """Run the built-in visual demo"""
+    from visualizer import ManufacturingVisualizer  # Deferred: matplotlib loads only when plotting
+    
     print("\nVISUAL ANALYSIS DEMO")
     print("="*100)
     print("Creating comprehensive visual analysis of your manufacturing data...")
     print("Each chart will be displayed and saved to output/ folder")
     
-    visualizer = ManufacturingVisualizer(analyzer)
+    visualizer = ManufacturingVisualizer(analyzer, dpi=dpi)
+    bundle = visualizer.compute_report_bundle()  # Data for all three charts, computed once
     
     # Create visualizations with user interaction
     print("\n1/3 Creating OEE Overview Dashboard...")
     print("   Shows: OEE components, overall performance, machine comparison")
     input("   Press Enter to generate chart...")
-    visualizer.plot_oee_overview()
+    visualizer.plot_oee_overview(bundle=bundle)
     
     print("\n2/3 Creating Trend Analysis...")
     print("   Shows: OEE trends over time with performance benchmarks")
     input("   Press Enter to generate chart...")
-    visualizer.plot_trends(metric='oee')
+    visualizer.plot_trends(metric='oee', bundle=bundle)
     
     print("\n3/3 Creating Machine Comparison...")
     print("   Shows: Performance comparison across all machines")
     input("   Press Enter to generate chart...")
-    visualizer.plot_machine_comparison()
+    visualizer.plot_machine_comparison(bundle=bundle)
     
     print("\nVisual demo complete!")
     print("All charts saved to output/ folder")
@@ -124,33 +162,35 @@ def run_specific_analysis(analyzer, mode, group_by=None, date_range=None):
     print("-"*100)
     
     try:
-        if mode == "oee":
-            results = analyzer.calculate_oee(group_by=group_by, date_range=date_range)
-        elif mode == "efficiency":
-            results = analyzer.calculate_overall_efficiency(group_by=group_by, date_range=date_range)
-        elif mode == "throughput":
-            results = analyzer.calculate_throughput_metrics(group_by=group_by, date_range=date_range)
-        elif mode == "downtime":
-            results = analyzer.calculate_downtime_analysis(group_by=group_by, date_range=date_range)
-        elif mode == "quality":
-            results = analyzer.calculate_quality_metrics(group_by=group_by, date_range=date_range)
-        elif mode == "top":
-            results = analyzer.get_top_performers(metric="oee")
+        results = ANALYSIS_DISPATCH[mode](analyzer, group_by=group_by, date_range=date_range)
         
-        # Display results
-        if isinstance(results, dict):
-            for key, value in results.items():
-                print(f"{key.replace('_', ' ').title()}: {value}")
+        # Display results ("all" returns one result per KPI family)
+        if mode == "all":
+            for section, section_results in results.items():
+                print(f"\n{section.upper()}:")
+                print_analysis_results(section_results)
         else:
-            print(results)
+            print_analysis_results(results)
             
     except Exception as e:
         print(f"Error during analysis: {str(e)}")
 
 
-def run_specific_visualization(analyzer, chart_type):
+def print_analysis_results(results):
+    """Prints a KPI result dict line by line, or a grouped result table"""
+    results = round_display(results)
+    if isinstance(results, dict):
+        for key, value in results.items():
+            print(f"{key.replace('_', ' ').title()}: {value}")
+    else:
+        print(results)
+
+
+def run_specific_visualization(analyzer, chart_type, dpi=None, combined_pdf=False):
     """Run specific visualization"""
-    visualizer = ManufacturingVisualizer(analyzer)
+    from visualizer import ManufacturingVisualizer  # Deferred: matplotlib loads only when plotting
+    
+    visualizer = ManufacturingVisualizer(analyzer, dpi=dpi)
     
     print(f"\nCreating {chart_type.replace('_', ' ').title()}...")
     
@@ -162,7 +202,7 @@ def run_specific_visualization(analyzer, chart_type):
         elif chart_type == "machines":
             visualizer.plot_machine_comparison()
         elif chart_type == "report":
-            visualizer.create_summary_report()
+            visualizer.create_summary_report(combined_pdf=combined_pdf)
         else:
             print(f"Unknown chart type: {chart_type}")
             return
@@ -177,28 +217,39 @@ def main():
     
     # Basic arguments
     parser.add_argument("--data", type=str, default="data/sample_data.csv",
-                       help="Path to manufacturing data CSV (default: data/sample_data.csv)")
+                       help="Path to manufacturing data CSV or Parquet file (default: data/sample_data.csv)")
     parser.add_argument("--start", type=str, help="Start date (YYYY-MM-DD)")
     parser.add_argument("--end", type=str, help="End date (YYYY-MM-DD)")
     
     # Analysis modes
     parser.add_argument("--mode", type=str, 
-                       choices=["summary", "oee", "efficiency", "throughput", 
-                               "downtime", "quality", "top", "viz"],
-                       help="Analysis mode: summary(default)|oee|efficiency|quality|downtime|top|viz")
+                       choices=ANALYSIS_MODES,
+                       help="Analysis mode: summary(default)|oee|efficiency|throughput|quality|downtime|top|all|viz")
     
     parser.add_argument("--group-by", type=str, 
-                       choices=["machine_id", "shift", "operator_id"],
+                       choices=GROUP_BY_FIELDS,
                        help="Group results by field: machine_id|shift|operator_id")
     
     # Visualization options  
     parser.add_argument("--chart", type=str,
-                       choices=["overview", "trends", "machines", "report"],
+                       choices=CHART_TYPES,
                        help="Specific chart type (use with --mode viz): overview|trends|machines|report")
     
+    parser.add_argument("--dpi", type=int,
+                       help="Resolution of saved charts (default: KPI_DPI environment variable, else 150)")
+    
+    parser.add_argument("--pdf", action="store_true",
+                       help="Save the report charts as one multi-page PDF (use with --chart report)")
+    
     parser.add_argument("--no-demo", action="store_true",
                        help="Skip visual demo in default mode")
     
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Re-read the data file instead of reusing the prepared-data cache")
+    
+    parser.add_argument("--engine", type=str, choices=CSV_ENGINES,
+                       help="CSV parser: pyarrow (default when installed) or c")
+    
     args = parser.parse_args()
     
     # Welcome message
@@ -214,10 +265,16 @@ def main():
     # Printing usage info on every run
     print_usage_info()
     
-    # Loading data
+    # Preparing date range
+    date_range = (args.start, args.end) if args.start and args.end else None
+    if date_range:
+        print(f"Filtering to: {args.start} to {args.end}")
+    
+    # Loading data - the date range is applied at load time so out-of-range rows are never processed
     try:
         print(f"Loading data from: {args.data}")
-        analyzer = da.ManufacturingKPIAnalyzer(data_path=args.data)
+        analyzer = da.ManufacturingKPIAnalyzer(data_path=args.data, date_range=date_range,
+                                               use_cache=not args.no_cache, csv_engine=args.engine)
         print(f"Loaded {len(analyzer.df)} records")
         
         date_range_str = f"{analyzer.df['timestamp'].min().date()} to {analyzer.df['timestamp'].max().date()}"
@@ -227,11 +284,6 @@ def main():
         print(f"Error loading data: {str(e)}")
         sys.exit(1)
     
-    # Preparing date range
-    date_range = (args.start, args.end) if args.start and args.end else None
-    if date_range:
-        print(f"Filtering to: {args.start} to {args.end}")
-    
     # Running based on mode
     if args.mode == "viz":
         # Specific visualization
@@ -239,7 +291,7 @@ def main():
             print("--chart required with --mode viz")
             parser.print_help()
             sys.exit(1)
-        run_specific_visualization(analyzer, args.chart)
+        run_specific_visualization(analyzer, args.chart, args.dpi, args.pdf)
         
     elif args.mode and args.mode != "summary":
         # Specific analysis mode
@@ -254,7 +306,7 @@ def main():
             demo_choice = input("Run visual demo? (y/n, default=y): ").lower().strip()
             
             if demo_choice != 'n':
-                run_visual_demo(analyzer)
+                run_visual_demo(analyzer, args.dpi)
         
     print(f"\nAnalysis complete!")
 
@@ -0,0 +1,277 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+import data_analyzer as da
+from generate_sample_data import generate_manufacturing_data
+
+
+class DateRangeLoadTest(unittest.TestCase):
+    """Regression checks for date ranges applied at load time and for a replaced analyzer frame"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path(tempfile.mkdtemp())
+        cls.data_path = cls.tmp_dir / 'data.csv'
+        cls.raw = generate_manufacturing_data(days=30)
+        cls.raw.to_csv(cls.data_path, index=False)
+
+        # A window in the middle of the data, so rows fall on both sides of it
+        days = cls.raw['timestamp'].dt.normalize().drop_duplicates().sort_values()
+        cls.date_range = (str(days.iloc[5].date()), str(days.iloc[9].date()))
+        start, end = pd.to_datetime(cls.date_range[0]), pd.to_datetime(cls.date_range[1])
+        cls.expected_rows = int(cls.raw['timestamp'].between(start, end).sum())
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def test_date_range_with_cache(self):
+        """Cold (cache written) and warm (cache read) loads both narrow to the date range"""
+        uncached = da.ManufacturingKPIAnalyzer(self.data_path, date_range=self.date_range)
+        for _ in range(2):
+            cached = da.ManufacturingKPIAnalyzer(self.data_path, date_range=self.date_range, use_cache=True)
+            self.assertEqual(len(cached.df), self.expected_rows)
+            self.assertEqual(cached.calculate_oee(), uncached.calculate_oee())
+        self.assertTrue(Path(f"{self.data_path}.cache.feather").exists())
+
+    def test_from_dataframe_with_date_range(self):
+        analyzer = da.ManufacturingKPIAnalyzer.from_dataframe(self.raw, date_range=self.date_range)
+        self.assertEqual(len(analyzer.df), self.expected_rows)
+
+    def test_replaced_frame_in_other_order(self):
+        """A frame reassigned in a different row order still filters by date correctly"""
+        analyzer = da.ManufacturingKPIAnalyzer(self.data_path)
+        expected = analyzer.calculate_oee(date_range=self.date_range)
+
+        analyzer.df = analyzer.df.sort_values('machine_id')
+        self.assertEqual(analyzer.calculate_oee(date_range=self.date_range), expected)
+        self.assertEqual(expected['total_shifts_analyzed'], self.expected_rows)
+
+    def test_replaced_frame_with_string_ids(self):
+        """A frame reassigned with plain (non-categorical) id columns is converted back to categoricals"""
+        analyzer = da.ManufacturingKPIAnalyzer(self.data_path)
+        expected = analyzer.calculate_oee(group_by='machine_id')
+
+        analyzer.df = analyzer.df.astype({'machine_id': str, 'shift': str})
+        pd.testing.assert_frame_equal(analyzer.calculate_oee(group_by='machine_id'), expected)
+        self.assertIsInstance(analyzer.df['machine_id'].dtype, pd.CategoricalDtype)
+
+
+class CacheSignatureTest(unittest.TestCase):
+    """The prepared-data cache is reused only while the source file and cache version are unchanged"""
+
+    def setUp(self):
+        self.tmp_dir = Path(tempfile.mkdtemp())
+        self.data_path = self.tmp_dir / 'data.csv'
+        generate_manufacturing_data(days=30).to_csv(self.data_path, index=False)
+        self.cache_path = Path(f"{self.data_path}.cache.feather")
+        self.expected = da.ManufacturingKPIAnalyzer(self.data_path).calculate_oee()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _load(self):
+        """A cached load of the data file, and whether it had to read the source file"""
+        read_data = da.ManufacturingKPIAnalyzer._read_data
+        with mock.patch.object(da.ManufacturingKPIAnalyzer, '_read_data', side_effect=read_data) as source_read:
+            analyzer = da.ManufacturingKPIAnalyzer(self.data_path, use_cache=True)
+        return analyzer, source_read.called
+
+    def _assert_loaded_from_source(self):
+        analyzer, from_source = self._load()
+        self.assertTrue(from_source)
+        self.assertEqual(analyzer.calculate_oee(), da.ManufacturingKPIAnalyzer(self.data_path).calculate_oee())
+        self.assertEqual(list(self.tmp_dir.glob('*.tmp')), [])
+
+    def test_unchanged_source_reuses_cache(self):
+        self.assertTrue(self._load()[1])
+        analyzer, from_source = self._load()
+        self.assertFalse(from_source)
+        self.assertEqual(analyzer.calculate_oee(), self.expected)
+        self.assertEqual(analyzer.df.attrs, {})
+        self.assertEqual(list(self.tmp_dir.glob('*.tmp')), [])
+
+    def test_modified_time_invalidates_cache(self):
+        self._load()
+        stat = self.data_path.stat()
+        os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self._assert_loaded_from_source()
+
+    def test_size_invalidates_cache(self):
+        self._load()
+        stat = self.data_path.stat()
+        with open(self.data_path, 'a') as f:
+            f.write(self.data_path.read_text().splitlines()[1] + '\n')
+        # Same modification time, so only the size tells the files apart
+        os.utime(self.data_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        self._assert_loaded_from_source()
+
+    def test_cache_version_invalidates_cache(self):
+        self._load()
+        with mock.patch.object(da, '_CACHE_VERSION', da._CACHE_VERSION + 1):
+            self._assert_loaded_from_source()
+        # The cache was rewritten for the newer version, so the old version no longer matches it
+        self.assertTrue(self._load()[1])
+
+    def test_corrupt_cache_falls_back_to_source(self):
+        for contents in (b'not a feather file', None):
+            with self.subTest(truncated=contents is None):
+                self._load()
+                if contents is None:
+                    contents = self.cache_path.read_bytes()[:100]
+                self.cache_path.write_bytes(contents)
+                self._assert_loaded_from_source()
+                self.assertFalse(self._load()[1])
+
+    def test_unwritable_directory_does_not_fail_the_load(self):
+        def fail_midway(df, path, **kwargs):
+            Path(path).write_bytes(b'partial')
+            raise PermissionError('read-only')
+
+        with mock.patch.object(pd.DataFrame, 'to_feather', autospec=True, side_effect=fail_midway):
+            analyzer, from_source = self._load()
+        self.assertTrue(from_source)
+        self.assertEqual(analyzer.calculate_oee(), self.expected)
+        self.assertEqual(analyzer.df.attrs, {})
+        self.assertFalse(self.cache_path.exists())
+        self.assertEqual(list(self.tmp_dir.glob('*.tmp')), [])
+
+
+class SchemaToleranceTest(unittest.TestCase):
+    """Inputs that load without the compact dtypes: blank cells, fractional counts, missing optional columns"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = Path(tempfile.mkdtemp())
+        cls.raw = generate_manufacturing_data(days=30)
+        cls.reference = da.ManufacturingKPIAnalyzer.from_dataframe(cls.raw)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp_dir)
+
+    def _load_csv(self, df, name):
+        """Analyzers for df written to CSV and read back with each CSV engine"""
+        path = self.tmp_dir / name
+        df.to_csv(path, index=False)
+        return [da.ManufacturingKPIAnalyzer(path, csv_engine=engine) for engine in ('c', 'pyarrow')]
+
+    def test_blank_cells(self):
+        """A blank count cell is skipped by the KPIs (as pandas' reductions do), a blank unused cell is ignored"""
+        df = self.raw.copy()
+        df.loc[5, 'quality_defects'] = np.nan
+        df.loc[7, 'setup_time_minutes'] = np.nan
+
+        for analyzer in self._load_csv(df, 'blank.csv'):
+            quality = analyzer.calculate_quality_metrics()
+            self.assertEqual(quality['total_defects'], df['quality_defects'].sum())
+            self.assertEqual(analyzer.calculate_oee()['total_production'], df['actual_production'].sum())
+            self.assertFalse(analyzer.calculate_oee(group_by='machine_id').isna().any().any())
+
+    def test_missing_optional_columns(self):
+        df = self.raw.drop(columns=['setup_time_minutes', 'material_waste_kg'])
+
+        for analyzer in self._load_csv(df, 'no_optional.csv'):
+            self.assertEqual(analyzer.calculate_oee(), self.reference.calculate_oee())
+        self.assertEqual(da.ManufacturingKPIAnalyzer.from_dataframe(df).calculate_oee(),
+                         self.reference.calculate_oee())
+
+    def test_fractional_counts_are_kept(self):
+        df = self.raw.assign(actual_production=self.raw['actual_production'] + 0.4)
+
+        for analyzer in self._load_csv(df, 'fractional.csv'):
+            self.assertAlmostEqual(analyzer.calculate_oee()['total_production'], df['actual_production'].sum())
+
+
+class GroupAggregateTest(unittest.TestCase):
+    """_group_aggregate's bincount kernels against pandas' groupby"""
+
+    def test_matches_pandas_groupby_with_blank_keys(self):
+        raw = generate_manufacturing_data(days=30)
+        raw.loc[[3, 50], 'machine_id'] = np.nan
+        raw.loc[9, 'shift'] = np.nan
+        raw.loc[20, 'downtime_minutes'] = np.nan
+        analyzer = da.ManufacturingKPIAnalyzer.from_dataframe(raw)
+        aggregations = {
+            'oee': ('oee', 'mean'),
+            'actual_production': ('actual_production', 'sum'),
+            'downtime_minutes': ('downtime_minutes', 'sum'),
+            'max_downtime': ('downtime_minutes', 'max'),
+            'shifts': ('oee', 'size')
+        }
+
+        for group_by in ('machine_id', 'shift', 'operator_id'):
+            with self.subTest(group_by=group_by):
+                result = analyzer._group_aggregate(analyzer.df, group_by, **aggregations)
+                expected = analyzer.df.groupby(group_by, observed=True).agg(**aggregations)
+                # pandas labels groups with a CategoricalIndex, the kernel with the plain category values
+                expected.index = expected.index.astype(result.index.dtype)
+                pd.testing.assert_frame_equal(result, expected, check_dtype=False, rtol=1e-5)
+        # The report lists only the real machine ids
+        self.assertEqual(analyzer.get_summary_report()['data_overview']['machines'],
+                         sorted(raw['machine_id'].dropna().unique()))
+
+
+class CalculateAllTest(unittest.TestCase):
+    """calculate_all's shared pass against the individual calculate_* methods"""
+
+    def test_matches_individual_calculations(self):
+        raw = generate_manufacturing_data(days=30)
+        days = raw['timestamp'].dt.normalize().drop_duplicates().sort_values()
+        date_range = (str(days.iloc[5].date()), str(days.iloc[9].date()))
+        methods = {
+            'oee': 'calculate_oee',
+            'efficiency': 'calculate_overall_efficiency',
+            'throughput': 'calculate_throughput_metrics',
+            'downtime': 'calculate_downtime_analysis',
+            'quality': 'calculate_quality_metrics'
+        }
+
+        for group_by in (None, 'machine_id', 'shift', 'operator_id'):
+            for window in (None, date_range):
+                with self.subTest(group_by=group_by, date_range=window):
+                    # Separate analyzers, so neither side is answered from the other's memoized results
+                    combined = da.ManufacturingKPIAnalyzer.from_dataframe(raw).calculate_all(group_by, window)
+                    analyzer = da.ManufacturingKPIAnalyzer.from_dataframe(raw)
+                    self.assertEqual(list(combined), list(methods))
+                    for section, method in methods.items():
+                        expected = getattr(analyzer, method)(group_by=group_by, date_range=window)
+                        if group_by:
+                            pd.testing.assert_frame_equal(combined[section], expected)
+                        else:
+                            self.assertEqual(combined[section], expected)
+
+
+class MemoizedResultTest(unittest.TestCase):
+    """Memoized KPI results are handed out as copies"""
+
+    def setUp(self):
+        self.analyzer = da.ManufacturingKPIAnalyzer.from_dataframe(generate_manufacturing_data(days=30))
+
+    def test_editing_a_result_does_not_change_later_calls(self):
+        overall = self.analyzer.calculate_oee()
+        expected_oee = overall['oee']
+        overall['oee'] = -1
+
+        grouped = self.analyzer.calculate_oee(group_by='machine_id')
+        expected_grouped = grouped.copy()
+        grouped['oee'] = 0
+
+        top = self.analyzer.get_top_performers()
+        expected_best = top['top_machines'].iloc[0]
+        top['top_machines'].iloc[0] = 0
+
+        self.assertEqual(self.analyzer.calculate_oee()['oee'], expected_oee)
+        pd.testing.assert_frame_equal(self.analyzer.calculate_oee(group_by='machine_id'), expected_grouped)
+        self.assertEqual(self.analyzer.get_top_performers()['top_machines'].iloc[0], expected_best)
+
+
+if __name__ == '__main__':
+    unittest.main()
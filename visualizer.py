@@ -1,32 +1,70 @@
+import matplotlib
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib.backends import BackendFilter, backend_registry
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.patches import Wedge
 import pandas as pd
 import numpy as np
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, wraps
 from pathlib import Path
 
-# Setting professional styling
+# Setting professional styling (every chart sets its own colors, so no palette is needed)
 plt.style.use('default')
-sns.set_palette("husl")
 
 # Configuring matplotlib for better screen display
 plt.rcParams['figure.max_open_warning'] = 50
 plt.rcParams['figure.dpi'] = 100  # Good balance for screen display
-plt.rcParams['savefig.dpi'] = 300  # High quality for saved files
+
+# File-only backends (Agg, PDF, SVG, ...) that cannot open a window
+_NON_INTERACTIVE_BACKENDS = frozenset(backend_registry.list_builtin(BackendFilter.NON_INTERACTIVE))
+
+
+def _new_run_id():
+    """Timestamp that names the files saved by one chart or report run"""
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+
+def _can_show():
+    """Check whether the active matplotlib backend can display figures on screen"""
+    return matplotlib.get_backend().lower() not in _NON_INTERACTIVE_BACKENDS
+
+
+def _with_chart_style(plot_method):
+    """Run a plot method inside the shared rcParams overrides in ManufacturingVisualizer._RC"""
+    @wraps(plot_method)
+    def wrapper(self, *args, **kwargs):
+        with plt.rc_context(self._RC):
+            return plot_method(self, *args, **kwargs)
+    
+    return wrapper
+
 
 class ManufacturingVisualizer:
     
-    def __init__(self, analyzer, output_dir='output'):
+    # Styling shared by every chart, applied once per plot instead of repeated on each call
+    _RC = {
+        'figure.titlesize': 14,
+        'figure.titleweight': 'bold',
+        'legend.fontsize': 9
+    }
+    
+    def __init__(self, analyzer, output_dir='output', dpi=None):
         """
         Initialize visualizer
         
         Args:
             analyzer: ManufacturingKPIAnalyzer instance
             output_dir: Directory to save charts
+            dpi: Resolution of saved charts (default: KPI_DPI environment variable, else 150)
         """
         self.analyzer = analyzer
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.dpi = int(dpi or os.environ.get('KPI_DPI', 150))
+        self._save_kwargs = {'dpi': self.dpi, 'pil_kwargs': {'compress_level': 1}}  # Fast zlib level
         
         # Simple color scheme
         self.colors = {
@@ -39,85 +77,169 @@ class ManufacturingVisualizer:
             'target_good': '#4CAF50', # Green for good targets
             'target_fair': '#FF9800'  # Orange for fair targets
         }
+        
+        # Performance band lookup: values below 65 / 75 / 85 / above map to poor / fair / good / excellent
+        self._thresholds = np.array([65., 75., 85.])
+        self._color_table = np.array([self.colors['poor'], self.colors['fair'],
+                                      self.colors['good'], self.colors['excellent']])
     
     def get_performance_color(self, value):
         """
         Simple function to get color based on performance value
         """
-        if value >= 85:
-            return self.colors['excellent']
-        elif value >= 75:
-            return self.colors['good']
-        elif value >= 65:
-            return self.colors['fair']
-        else:
-            return self.colors['poor']
+        return self.get_performance_colors([value])[0]
+    
+    def get_performance_colors(self, values):
+        """
+        Colors for a whole sequence of performance values, looked up in one vectorized pass
+        Args:
+            values: array-like of percentages (e.g. a column of per-machine OEE)
+        Returns a list of hex colors, one per value
+        """
+        # side='right' so a value exactly on a threshold falls into the higher band
+        return self._color_table[np.searchsorted(self._thresholds, np.asarray(values), side='right')].tolist()
     
-    def plot_oee_overview(self, save=True):
+    def _label_bars(self, ax, bars, fmt='{:.1f}%', inside=False):
+        """
+        Bold value labels for a whole bar container in one bar_label call
+        Args:
+            fmt: format string applied to each bar's value
+            inside: place white labels just inside the bar ends instead of above them
+        """
+        if not inside:
+            return ax.bar_label(bars, fmt=fmt, padding=3, fontweight='bold')
+        
+        labels = ax.bar_label(bars, fmt=fmt, padding=-5, fontweight='bold', color='white')
+        # bar_label aligns edge labels away from the bar; flipping the alignment pulls them inside
+        plt.setp(labels, **({'ha': 'right'} if bars.orientation == 'horizontal' else {'va': 'top'}))
+        return labels
+    
+    def _add_benchmarks(self, ax, benchmarks=None, linestyle='--', linewidth=3):
+        """
+        Horizontal target lines across the full axes width, drawn as one line collection
+        Args:
+            benchmarks: (value, color, label) tuples (default: World Class 85% and Good 75%)
+            linestyle, linewidth: shared style for every line
+        """
+        if benchmarks is None:
+            benchmarks = ((85, self.colors['target_good'], 'World Class (85%)'),
+                          (75, self.colors['target_fair'], 'Good (75%)'))
+        values, colors, labels = zip(*benchmarks)
+        
+        # Colors go in as a list: matplotlib reads a 2-tuple of colors as a single (color, alpha) pair
+        ax.hlines(values, 0, 1, transform=ax.get_yaxis_transform(), colors=list(colors),
+                  linestyles=linestyle, linewidths=linewidth, alpha=0.8)
+        # Empty proxy lines give each benchmark its own legend entry
+        for color, label in zip(colors, labels):
+            ax.plot([], [], linestyle=linestyle, linewidth=linewidth, color=color, alpha=0.8, label=label)
+    
+    def compute_report_bundle(self):
+        """
+        Compute every dataset the three standard charts need, once
+        Returns a dict that plot_oee_overview, plot_trends and plot_machine_comparison accept as bundle
+        """
+        # Computed one after another: the analyzer's memo and filter caches are not locked for concurrent use
+        return {
+            'oee_overall': self.analyzer.calculate_oee(),
+            'oee_by_machine': self.analyzer.calculate_oee(group_by='machine_id'),
+            'efficiency_by_machine': self.analyzer.calculate_overall_efficiency(group_by='machine_id'),
+            'machine_comparison': self.analyzer.get_machine_comparison(),
+            'daily_trend': self._daily_means('oee')
+        }
+    
+    def _daily_means(self, metric):
+        """Daily averages of a per-shift metric, indexed by date"""
+        # Integer day codes instead of a copied frame with a date column
+        calendar_days = self.analyzer.df['timestamp'].to_numpy().astype('datetime64[D]')
+        day_idx, unique_days = pd.factorize(calendar_days, sort=True)
+        
+        # Calculating daily averages as per-day sums / per-day counts
+        values = self.analyzer.df[metric].to_numpy()
+        daily_means = np.bincount(day_idx, weights=values) / np.bincount(day_idx)
+        return pd.Series(daily_means, index=pd.DatetimeIndex(unique_days))
+    
+    @_with_chart_style
+    def plot_oee_overview(self, save=True, bundle=None, block=True, headless=False, pdf_writer=None, run_id=None):
         """
         Create main OEE overview dashboard
+        Args:
+            bundle: optional precomputed data from compute_report_bundle()
+            block: whether plt.show() waits for the window to close
+            headless: skip plt.show() and return (fig, filepath) instead of fig
+            pdf_writer: optional open PdfPages; when given the chart is added to it as a page instead of saved as a PNG
+            run_id: timestamp string used in the saved file name (default: now), shared by a report's charts
         """
         # Getting the needed data
-        oee_data = self.analyzer.calculate_oee()
-        machine_oee = self.analyzer.calculate_oee(group_by='machine_id')
+        if bundle is None:
+            oee_data = self.analyzer.calculate_oee()
+            machine_oee = self.analyzer.calculate_oee(group_by='machine_id')
+            efficiency_data = self.analyzer.calculate_overall_efficiency(group_by='machine_id')
+        else:
+            oee_data = bundle['oee_overall']
+            machine_oee = bundle['oee_by_machine']
+            efficiency_data = bundle['efficiency_by_machine']
         
         # Creating 2x2 subplot layout
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
-        fig.suptitle('Manufacturing OEE Overview', fontsize=14, fontweight='bold')
+        fig.suptitle('Manufacturing OEE Overview')
         
         # Chart 1: OEE Components (Horizontal Bar Chart)
         components = ['Availability', 'Performance', 'Quality Rate']
         values = [oee_data['availability'], oee_data['performance'], oee_data['quality_rate']]
-        colors = [self.get_performance_color(v) for v in values]
+        colors = self.get_performance_colors(values)
         
         bars = ax1.barh(components, values, color=colors, alpha=0.8)
         ax1.set_xlim(0, 105)
         ax1.set_xlabel('Percentage (%)')
         ax1.set_title('OEE Components')
         
-        # Adding value labels for readability
-        for bar, value in zip(bars, values):
-            ax1.text(bar.get_width() - 5, bar.get_y() + bar.get_height()/2, f'{value:.1f}%', va='center', ha='right', fontweight='bold', color='white')
+        # Adding value labels for readability, right-aligned inside the bar ends
+        self._label_bars(ax1, bars, inside=True)
         
         # Chart 2: Overall OEE (Simple gauge-style)
         oee_value = oee_data['oee']
         
-        # Creating a simple "gauge" using a pie chart
-        sizes = [oee_value, 100 - oee_value]
-        colors_gauge = [self.get_performance_color(oee_value), 'lightgray']
-        
-        wedges, texts = ax2.pie(sizes, colors=colors_gauge, startangle=90, counterclock=False)
+        # Creating a simple "gauge" from two wedges: the OEE share runs clockwise from 12 o'clock
+        split_angle = 90 - 3.6 * oee_value
+        ax2.add_patch(Wedge((0, 0), 1, split_angle, 90, facecolor=self.get_performance_color(oee_value)))
+        ax2.add_patch(Wedge((0, 0), 1, 90 - 360, split_angle, facecolor='lightgray'))
+        ax2.set_xlim(-1.1, 1.1)
+        ax2.set_ylim(-1.1, 1.1)
+        ax2.set_aspect('equal')
+        ax2.axis('off')
         
         # Adding center text
         ax2.text(0, 0, f'{oee_value:.1f}%\nOEE', ha='center', va='center', fontsize=20, fontweight='bold')
         ax2.set_title('Overall OEE')
         
         # Chart 3: OEE by Machine (Vertical Bar Chart)
-        machines = machine_oee.index.tolist()
-        machine_values = machine_oee['oee'].values
-        machine_colors = [self.get_performance_color(v) for v in machine_values]
+        # Bars sit at integer positions with the machine ids as tick labels, which skips
+        # matplotlib's string-category axis conversion
+        machines = machine_oee.index.to_numpy()
+        x = np.arange(len(machines))
+        machine_values = machine_oee['oee'].to_numpy()
+        machine_colors = self.get_performance_colors(machine_values)
         
-        bars = ax3.bar(machines, machine_values, color=machine_colors, alpha=0.8)
+        bars = ax3.bar(x, machine_values, color=machine_colors, alpha=0.8)
+        ax3.set_xticks(x, machines)
         ax3.set_ylabel('OEE (%)')
         ax3.set_xlabel('Machine ID')
         ax3.set_title('OEE by Machine')
         ax3.set_ylim(0, 100)
         
         # Adding benchmark lines to show target performance
-        ax3.axhline(85, color=self.colors['target_good'], linestyle='--', alpha=0.8, label='World Class (85%)')
-        ax3.axhline(75, color=self.colors['target_fair'], linestyle='--', alpha=0.8, label='Good (75%)')
-        ax3.legend(fontsize=9, loc='lower right')
+        self._add_benchmarks(ax3, linewidth=1.5)
+        ax3.legend(loc='lower right')
         
         # Adding value labels on bars
-        for bar, value in zip(bars, machine_values):
-            ax3.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+        self._label_bars(ax3, bars)
         
         # Chart 4: Production Efficiency
-        efficiency_data = self.analyzer.calculate_overall_efficiency(group_by='machine_id')
-        actual = efficiency_data['actual_production'].values
-        target = efficiency_data['target_production'].values
+        # Both production columns pulled out in a single block conversion, reindexed to the
+        # chart 3 machine order so each pair of bars lines up with its tick label
+        target, actual = (efficiency_data[['target_production', 'actual_production']]
+                          .reindex(machine_oee.index).to_numpy(dtype=np.float64).T)
         
-        x = np.arange(len(machines))
         width = 0.35
         
         ax4.bar(x - width/2, target, width, label='Target', color='lightblue', alpha=0.7)
@@ -126,33 +248,44 @@ class ManufacturingVisualizer:
         ax4.set_ylabel('Production Units')
         ax4.set_xlabel('Machine ID')
         ax4.set_title('Production: Target vs Actual')
-        ax4.set_xticks(x)
-        ax4.set_xticklabels(machines)
-        ax4.legend(fontsize=9, loc="lower right")
+        ax4.set_xticks(x, machines)
+        ax4.legend(loc="lower right")
         
         # Adjusting layout to prevent overlap
         plt.tight_layout()
         
         # Saving if requested
-        if save:
-            filename = f"oee_overview_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        filepath = None
+        if pdf_writer is not None:
+            pdf_writer.savefig(fig, dpi=self.dpi)
+        elif save:
+            filename = f"oee_overview_{run_id or _new_run_id()}.png"
             filepath = self.output_dir / filename
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
+            fig.savefig(filepath, **self._save_kwargs)
             print(f"Saved: {filepath}")
         
-        plt.show()
+        if headless:
+            return fig, filepath
+        if _can_show():  # Batch runs on a file-only backend skip the display step entirely
+            plt.show(block=block)
         return fig
     
-    def plot_trends(self, metric='oee', days=30, save=True):
+    @_with_chart_style
+    def plot_trends(self, metric='oee', days=30, save=True, bundle=None, block=True, headless=False, pdf_writer=None, run_id=None):
         """
         Simple trend analysis over time
+        Args:
+            bundle: optional precomputed data from compute_report_bundle() (used for the OEE metric)
+            block: whether plt.show() waits for the window to close
+            headless: skip plt.show() and return (fig, filepath) instead of fig
+            pdf_writer: optional open PdfPages; when given the chart is added to it as a page instead of saved as a PNG
+            run_id: timestamp string used in the saved file name (default: now), shared by a report's charts
         """
         # Preparing time-series data
-        df = self.analyzer.df.copy()
-        df['date'] = df['timestamp'].dt.date  # Extracting just the date
-        
-        # Grouping by date and calculating daily averages
-        daily_data = df.groupby('date')[metric].mean()
+        if bundle is not None and metric == 'oee':
+            daily_data = bundle['daily_trend']
+        else:
+            daily_data = self._daily_means(metric)
         
         # Limiting to recent days if specified
         if days and len(daily_data) > days:
@@ -164,154 +297,265 @@ class ManufacturingVisualizer:
         # Plotting main trend line
         ax.plot(daily_data.index, daily_data.values, marker='o', linewidth=2, markersize=4, color=self.colors['primary'])
         
-        # Adding trend line using numpy polyfit to show mathematical concepts
-        x_numeric = np.arange(len(daily_data))
-        trend_coeffs = np.polyfit(x_numeric, daily_data.values, 1)  # Linear trend
-        trend_line = np.poly1d(trend_coeffs)
+        # Adding a least-squares trend line, solved in closed form (slope = cov(x, y) / var(x));
+        # x is the day position 0..n-1, so its mean and sum of squared deviations are known exactly
+        n_days = len(daily_data)
+        y_values = daily_data.to_numpy(dtype=np.float64)
+        x_centered = np.arange(n_days, dtype=np.float64) - (n_days - 1) / 2
+        x_spread = n_days * (n_days * n_days - 1) / 12
+        slope = (x_centered @ y_values) / x_spread if x_spread else 0.0  # Flat line for a single day
+        trend_values = y_values.mean() + slope * x_centered
         
-        ax.plot(daily_data.index, trend_line(x_numeric), linestyle='--', linewidth=3, color=self.colors['primary'], alpha=0.8, label=f'Trend (slope: {trend_coeffs[0]:.2f})')
+        ax.plot(daily_data.index, trend_values, linestyle='--', linewidth=3, color=self.colors['primary'], alpha=0.8, label=f'Trend (slope: {slope:.2f})')
         
         # Formatting
         ax.set_title(f'{metric.upper()} Trend Analysis (Last {len(daily_data)} days)', fontsize=14, fontweight='bold')
         ax.set_ylabel(f'{metric.upper()} (%)')
         ax.set_xlabel('Date')
         ax.grid(True, alpha=0.3)
-        ax.legend()
         
         # Rotating x-axis labels for better readability
         plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
         
         # Adding benchmark line for OEE
         if metric == 'oee':
-            ax.axhline(85, color=self.colors['target_good'], linestyle=':', alpha=0.8, linewidth=3, label='World Class Target')
-            ax.axhline(75, color=self.colors['target_fair'], linestyle=':', alpha=0.8, linewidth=3, label='Good Target')
-            ax.legend()
+            self._add_benchmarks(ax, ((85, self.colors['target_good'], 'World Class Target'),
+                                      (75, self.colors['target_fair'], 'Good Target')), linestyle=':')
+        
+        # One legend covering the trend and any benchmark lines (single-panel chart: the default 10pt, not _RC's 9pt)
+        ax.legend(fontsize=10)
         
         plt.tight_layout()
         
-        if save:
-            filename = f"{metric}_trends_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        filepath = None
+        if pdf_writer is not None:
+            pdf_writer.savefig(fig, dpi=self.dpi)
+        elif save:
+            filename = f"{metric}_trends_{run_id or _new_run_id()}.png"
             filepath = self.output_dir / filename
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
+            fig.savefig(filepath, **self._save_kwargs)
             print(f"Saved: {filepath}")
         
-        plt.show()
+        if headless:
+            return fig, filepath
+        if _can_show():  # Batch runs on a file-only backend skip the display step entirely
+            plt.show(block=block)
         return fig
     
-    def plot_machine_comparison(self, save=True):
+    @_with_chart_style
+    def plot_machine_comparison(self, save=True, bundle=None, block=True, headless=False, pdf_writer=None, run_id=None):
         """
         Compare all machines across key metrics
+        Args:
+            bundle: optional precomputed data from compute_report_bundle()
+            block: whether plt.show() waits for the window to close
+            headless: skip plt.show() and return (fig, filepath) instead of fig
+            pdf_writer: optional open PdfPages; when given the chart is added to it as a page instead of saved as a PNG
+            run_id: timestamp string used in the saved file name (default: now), shared by a report's charts
         """
         # Getting machine data
-        machine_data = self.analyzer.get_machine_comparison()
-        machines = machine_data.index.tolist()
+        machine_data = self.analyzer.get_machine_comparison() if bundle is None else bundle['machine_comparison']
+        machines = machine_data.index.to_numpy()
+        x = np.arange(len(machines))  # Integer bar positions; machine ids become the tick labels
+        
+        # Converting the four plotted columns to one float array once; each metric below is a column view
+        metric_values = machine_data[['oee', 'availability', 'quality_rate', 'actual_production']].to_numpy(dtype=np.float64)
         
         # Creating 2x2 subplot for key metrics
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(12, 8))
-        fig.suptitle('Machine Performance Comparison', fontsize=14, fontweight='bold')
+        fig.suptitle('Machine Performance Comparison')
         
         # Metric 1: OEE
-        oee_values = machine_data['oee'].values
-        colors_oee = [self.get_performance_color(v) for v in oee_values]
+        oee_values = metric_values[:, 0]
+        colors_oee = self.get_performance_colors(oee_values)
         
-        bars1 = ax1.bar(machines, oee_values, color=colors_oee, alpha=0.8)
+        bars1 = ax1.bar(x, oee_values, color=colors_oee, alpha=0.8)
+        ax1.set_xticks(x, machines)
         ax1.set_title('OEE by Machine')
         ax1.set_ylabel('OEE (%)')
         ax1.set_xlabel('Machine ID')
         ax1.set_ylim(0, 100)
-        ax1.axhline(85, color=self.colors['target_good'], linestyle='--', alpha=0.8, linewidth=3, label='World Class (85%)')
-        ax1.axhline(75, color=self.colors['target_fair'], linestyle='--', alpha=0.8, linewidth=3, label='Good (75%)')
-        ax1.legend(fontsize=9, loc="lower right")
+        self._add_benchmarks(ax1)
+        ax1.legend(loc="lower right")
         
         # Adding value labels - reusable pattern
-        for bar, value in zip(bars1, oee_values):
-            ax1.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 1, f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+        self._label_bars(ax1, bars1)
         
         # Metric 2: Availability
-        avail_values = machine_data['availability'].values
-        colors_avail = [self.get_performance_color(v) for v in avail_values]
+        avail_values = metric_values[:, 1]
+        colors_avail = self.get_performance_colors(avail_values)
         
-        bars2 = ax2.bar(machines, avail_values, color=colors_avail, alpha=0.8)
+        bars2 = ax2.bar(x, avail_values, color=colors_avail, alpha=0.8)
+        ax2.set_xticks(x, machines)
         ax2.set_title('Availability by Machine')
         ax2.set_ylabel('Availability (%)')
         ax2.set_xlabel('Machine ID')
         ax2.set_ylim(0, 100)
         
-        for bar, value in zip(bars2, avail_values):
-            ax2.text(bar.get_x() + bar.get_width()/2, bar.get_height() - max(avail_values)*0.07, f'{value:.1f}%', ha='center', va='bottom', fontweight='bold', color='white')
+        self._label_bars(ax2, bars2, inside=True)
         
         # Metric 3: Quality Rate
-        quality_values = machine_data['quality_rate'].values
+        quality_values = metric_values[:, 2]
         
-        bars3 = ax3.bar(machines, quality_values, color=self.colors['excellent'], alpha=0.8)
+        bars3 = ax3.bar(x, quality_values, color=self.colors['excellent'], alpha=0.8)
+        ax3.set_xticks(x, machines)
         ax3.set_title('Quality Rate by Machine')
         ax3.set_ylabel('Quality Rate (%)')
         ax3.set_xlabel('Machine ID')
         ax3.set_ylim(90, 100)  # Zoom in on quality range
-        ax3.axhline(95, color=self.colors['poor'], linestyle='--', alpha=0.8, linewidth=3, label='Target (95%)')
-        ax3.legend(fontsize=9, loc="lower right")
+        self._add_benchmarks(ax3, ((95, self.colors['poor'], 'Target (95%)'),))
+        ax3.legend(loc="lower right")
         
-        for bar, value in zip(bars3, quality_values):
-            ax3.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.1, f'{value:.1f}%', ha='center', va='bottom', fontweight='bold')
+        self._label_bars(ax3, bars3)
         
         # Metric 4: Total Production
-        prod_values = machine_data['actual_production'].values
+        prod_values = metric_values[:, 3]
         
-        bars4 = ax4.bar(machines, prod_values, color=self.colors['primary'], alpha=0.8)
+        bars4 = ax4.bar(x, prod_values, color=self.colors['primary'], alpha=0.8)
+        ax4.set_xticks(x, machines)
         ax4.set_title('Total Production by Machine')
         ax4.set_ylabel('Total Units Produced')
         ax4.set_xlabel('Machine ID')
         
-        for bar, value in zip(bars4, prod_values):
-            ax4.text(bar.get_x() + bar.get_width()/2, bar.get_height() - max(prod_values)*0.07, f'{value:,.0f}', ha='center', va='bottom', fontweight='bold', color='white')
+        self._label_bars(ax4, bars4, fmt='{:,.0f}', inside=True)
         
         plt.tight_layout()
         
-        if save:
-            filename = f"machine_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
+        filepath = None
+        if pdf_writer is not None:
+            pdf_writer.savefig(fig, dpi=self.dpi)
+        elif save:
+            filename = f"machine_comparison_{run_id or _new_run_id()}.png"
             filepath = self.output_dir / filename
-            plt.savefig(filepath, dpi=300, bbox_inches='tight')
+            fig.savefig(filepath, **self._save_kwargs)
             print(f"Saved: {filepath}")
         
-        plt.show()
+        if headless:
+            return fig, filepath
+        if _can_show():  # Batch runs on a file-only backend skip the display step entirely
+            plt.show(block=block)
         return fig
     
-    def create_summary_report(self, save=True):
+    def create_summary_report(self, save=True, block=True, headless=None, combined_pdf=False):
         """
         Create a simple summary report with key insights
+        Args:
+            headless: save the charts without displaying them, rendering in parallel worker processes
+                      on multi-core machines (default: only when matplotlib runs a non-interactive backend such as Agg)
+            combined_pdf: save the three charts as pages of one PDF instead of separate PNGs
         """
         print("Generating Manufacturing Summary Report...")
         
+        # Computing the data for all three charts in one go
+        bundle = self.compute_report_bundle()
+        
+        if headless is None:
+            headless = not _can_show()
+        
+        # One timestamp for every file of this report, so the charts' names match
+        run_id = _new_run_id()
+        
+        if combined_pdf and save:
+            return self._create_pdf_report(bundle, block, headless, run_id)
+        
+        if headless and save and (os.cpu_count() or 1) > 1:
+            # Rendering and PNG-encoding the three charts concurrently, one process each
+            print("Rendering 3 charts in parallel...")
+            with ProcessPoolExecutor(max_workers=len(_REPORT_CHARTS)) as executor:
+                futures = [executor.submit(_render_and_save, bundle, chart_kind, self.output_dir, self.dpi, run_id)
+                           for chart_kind in _REPORT_CHARTS]
+                for future in futures:
+                    future.result()
+            
+            print("Summary report complete!")
+            print(f"All files saved to: {self.output_dir}")
+            return True
+        
         # Creating multiple charts
         print("1/3 Creating OEE Overview...")
-        self.plot_oee_overview(save=save)
+        overview = self.plot_oee_overview(save=save, bundle=bundle, block=block, headless=headless, run_id=run_id)
+        if headless:
+            plt.close(overview[0])  # Nothing displays a headless chart once saved, so its memory is released right away
         
         print("2/3 Creating Trend Analysis...")
-        self.plot_trends(metric='oee', save=save)
+        trends = self.plot_trends(metric='oee', save=save, bundle=bundle, block=block, headless=headless, run_id=run_id)
+        if headless:
+            plt.close(trends[0])
         
         print("3/3 Creating Machine Comparison...")
-        self.plot_machine_comparison(save=save)
+        comparison = self.plot_machine_comparison(save=save, bundle=bundle, block=block, headless=headless, run_id=run_id)
+        if headless:
+            plt.close(comparison[0])
         
         print("Summary report complete!")
         print(f"All files saved to: {self.output_dir}")
         
         return True
+    
+    def _create_pdf_report(self, bundle, block, headless, run_id):
+        """Draw the three report charts into one multi-page PDF, one page per chart"""
+        filepath = self.output_dir / f"summary_report_{run_id}.pdf"
+        
+        with PdfPages(filepath) as pdf:
+            print("1/3 Creating OEE Overview...")
+            overview = self.plot_oee_overview(bundle=bundle, block=block, headless=headless, pdf_writer=pdf)
+            if headless:
+                plt.close(overview[0])  # Each page is written as soon as it is added, so the figure can go
+            
+            print("2/3 Creating Trend Analysis...")
+            trends = self.plot_trends(metric='oee', bundle=bundle, block=block, headless=headless, pdf_writer=pdf)
+            if headless:
+                plt.close(trends[0])
+            
+            print("3/3 Creating Machine Comparison...")
+            comparison = self.plot_machine_comparison(bundle=bundle, block=block, headless=headless, pdf_writer=pdf)
+            if headless:
+                plt.close(comparison[0])
+        
+        print("Summary report complete!")
+        print(f"Saved: {filepath}")
+        
+        return True
+
+
+# Report charts rendered by create_summary_report, in display order
+_REPORT_CHARTS = ('overview', 'trends', 'machines')
+
+
+def _render_and_save(bundle, chart_kind, output_dir, dpi, run_id):
+    """Worker-process entry point: renders one report chart off-screen and returns the saved path"""
+    plt.switch_backend('Agg')
+    visualizer = ManufacturingVisualizer(None, output_dir, dpi)
+    
+    if chart_kind == 'overview':
+        fig, filepath = visualizer.plot_oee_overview(bundle=bundle, headless=True, run_id=run_id)
+    elif chart_kind == 'trends':
+        fig, filepath = visualizer.plot_trends(metric='oee', bundle=bundle, headless=True, run_id=run_id)
+    else:
+        fig, filepath = visualizer.plot_machine_comparison(bundle=bundle, headless=True, run_id=run_id)
+    
+    plt.close(fig)
+    return filepath
+
+
+@lru_cache(maxsize=4)
+def _get_analyzer(data_path, mtime_ns):
+    """Analyzer for a data file, shared by repeated quick_* calls until the file changes (mtime_ns is the cache key)"""
+    from data_analyzer import ManufacturingKPIAnalyzer
+    
+    return ManufacturingKPIAnalyzer(data_path)
 
 
 # Convenience functions for easy use
 def quick_overview(data_path='data/sample_data.csv'):
     """One function call OEE overview"""
-    from data_analyzer import ManufacturingKPIAnalyzer
-    
-    analyzer = ManufacturingKPIAnalyzer(data_path)
+    analyzer = _get_analyzer(data_path, os.stat(data_path).st_mtime_ns)
     visualizer = ManufacturingVisualizer(analyzer)
     return visualizer.plot_oee_overview()
 
 
 def quick_trends(data_path='data/sample_data.csv', metric='oee'):
     """One function call trend analysis"""  
-    from data_analyzer import ManufacturingKPIAnalyzer
-    
-    analyzer = ManufacturingKPIAnalyzer(data_path)
+    analyzer = _get_analyzer(data_path, os.stat(data_path).st_mtime_ns)
     visualizer = ManufacturingVisualizer(analyzer)
-    return visualizer.plot_trends(metric=metric)
\ No newline at end of file
+    return visualizer.plot_trends(metric=metric)